@@ -2,34 +2,39 @@
 
 import enum
 import functools
-from io import BytesIO
+import json
 import os
+import shelve
+import string
 import tempfile
+import threading
 from typing import Any, Callable, NewType
 import typing
 
 from dbus_next.message import Message
 import StreamDeck
 from StreamDeck.DeviceManager import DeviceManager
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, UnidentifiedImageError
 from dbus_next.aio import MessageBus
 from dbus_next.service import (ServiceInterface,
                                method, dbus_property, signal as dbus_signal)
 from dbus_next import Variant, DBusError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import asyncio
 import signal
 
 import gi
 gi.require_version("Gtk", "4.0")
+gi.require_version("Rsvg", "2.0")
 try:
     gi.require_foreign("cairo")
 except ImportError:
     print("No pycairo integration :(")
     exit(1)
-from gi.repository import Gtk, Gdk
+from gi.repository import Gtk, Gdk, Rsvg
 import cairo
-import cairosvg
 from StreamDeck.ImageHelpers import PILHelper
 from desktop_parser import DesktopFile
 
@@ -44,27 +49,51 @@ class ImageFileFormat(enum.Enum):
     PNG = 0
     JPG = 1
 
+# loaded lazily so a missing font path fails the SetText call, not the
+# whole daemon at import time (distros disagree on where Noto lives)
+@functools.lru_cache(maxsize=None)
+def _font():
+    return ImageFont.truetype("/usr/share/fonts/noto/NotoSans-Regular.ttf", 14)
+
+_TEXT_CANVASES: dict = {}
+
+@functools.lru_cache(maxsize=256)
+def _render_text_to_native(deck, text):
+    # reuse one canvas per deck: create_key_image already produces an image
+    # at native key size, so each cache miss is clear + draw + encode with
+    # no fresh allocation and no rescale pass
+    canvas = _TEXT_CANVASES.get(deck)
+    if canvas is None:
+        canvas = _TEXT_CANVASES.setdefault(deck, PILHelper.create_key_image(deck))
+    draw = ImageDraw.Draw(canvas)
+    draw.rectangle([0, 0, canvas.width, canvas.height], fill="black")
+    draw.text((canvas.width / 2, canvas.height / 2), text=text, font=_font(), anchor="ms", fill="white")
+    return PILHelper.to_native_key_format(deck, canvas)
+
 class StreamDeckInterface(ServiceInterface):
     def __init__(self, deck):
         super().__init__('net.shehadeh.StreamDeck')
         self.deck = deck
-        self.font = ImageFont.truetype("/usr/share/fonts/noto/NotoSans-Regular.ttf", 14)
-        self.deck.set_key_callback(lambda _deck, key, state: self.StateChange(key, state))
+        # the key callback fires on the StreamDeck library's HID reader
+        # thread; emitting a dbus signal there is unsafe and stalls the
+        # reader, so bounce the emission onto the event loop
+        self._loop = asyncio.get_running_loop()
+        self.deck.set_key_callback(
+            lambda _deck, key, state: self._loop.call_soon_threadsafe(self.StateChange, key, state))
 
     @method()
     def SetImage(self, key: 'i', image_file_path: 's'):
         try:
-            file_stream = open(image_file_path, mode="br")
-        except Exception as e:
-            raise DBusError('net.shehadeh.error.InvalidFileDescriptor',
-                            f'failed to open file descriptor: {e}')
-
-        icon = None
-        try:
-            icon = Image.open(file_stream)
-        except Exception as e:
+            # let Pillow manage the file itself (it can mmap supported
+            # formats) and close it as soon as the pixels are loaded
+            with Image.open(image_file_path) as icon:
+                icon.load()
+        except UnidentifiedImageError as e:
             raise DBusError('net.shehadeh.error.InvalidImage',
                             f'failed to decode image: {e}')
+        except OSError as e:
+            raise DBusError('net.shehadeh.error.InvalidFileDescriptor',
+                            f'failed to open file descriptor: {e}')
         try:
             key_image = PILHelper.create_scaled_key_image(self.deck, icon, margins=[0, 0, 0, 0])
             self.deck.set_key_image(key, PILHelper.to_native_key_format(self.deck, key_image))
@@ -75,12 +104,7 @@ class StreamDeckInterface(ServiceInterface):
     @method()
     def SetText(self, key: 'i', text: 's'):
         try:
-            icon = PILHelper.create_key_image(self.deck)
-            draw = ImageDraw.Draw(icon)
-            draw.text((icon.width / 2, icon.height / 2), text=text, font=self.font, anchor="ms", fill="white")
-
-            key_image = PILHelper.create_scaled_key_image(self.deck, icon, margins=[0, 0, 0, 0])
-            self.deck.set_key_image(key, PILHelper.to_native_key_format(self.deck, key_image))
+            self.deck.set_key_image(key, _render_text_to_native(self.deck, text))
         except Exception as e:
             raise DBusError('net.shehadeh.error.InvalidImage',
                             f'failed to set key image: {e}')
@@ -90,31 +114,65 @@ class StreamDeckInterface(ServiceInterface):
     def StateChange(self, key: int, pressed: bool) -> '(ib)':
         return [key, pressed]
 
+# lru_cache does not serialize concurrent misses, so guard both the lazy
+# shelve.open (a second writer open of the same dbm raises) and all
+# reads/writes on the shared handle
+_icon_cache_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _icon_disk_cache():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir())
+    cache_dir = os.path.join(runtime_dir, "plasmadeck-icons")
+    os.makedirs(cache_dir, exist_ok=True)
+    return shelve.open(os.path.join(cache_dir, "wm-class"))
+
+@functools.lru_cache(maxsize=None)
+def _desktop_icon_table():
+    data_dirs = os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")
+    data_home = os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share"))
+    table: dict[str, str] = {}
+    # scan lowest-priority dirs first so higher-priority entries overwrite
+    for data_dir in reversed([data_home] + data_dirs):
+        app_dir = os.path.join(data_dir, "applications")
+        try:
+            entries = list(os.scandir(app_dir))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith(".desktop") or not entry.is_file():
+                continue
+            try:
+                file = DesktopFile.from_file(entry.path)
+            except Exception:
+                continue
+            icon = file.data.get("Desktop Entry", {}).get("Icon")
+            if icon is not None:
+                table[entry.name.removesuffix(".desktop")] = icon
+    return table
+
 def desktop_file_from_wm_class(wm_class):
-    desktop_locations = [
-        "/usr/share/applications/"
-    ]
-    
-    for desktop_file_dir in desktop_locations:
-        path = os.path.join(desktop_file_dir, f"{wm_class}.desktop")
-        if os.path.exists(path):
-            file = DesktopFile.from_file(path)
-            if "Icon" in file.data["Desktop Entry"]:
-                return file.data["Desktop Entry"]["Icon"]
-            else:
-                return None
-    return None
+    return _desktop_icon_table().get(wm_class)
 
+@functools.lru_cache(maxsize=512)
 def get_icon_path_by_wm_class(wm_class):
-    theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
-    icon = desktop_file_from_wm_class(wm_class)
-    if icon is None:
-        return None
-    for resolution in [16, 20, 22, 24, 28, 32, 36, 48, 64, 72, 96, 128, 192, 256, 480, 512, 1024]:
-        icon = theme.lookup_icon(icon, [], resolution, 1, 0, 0)
+    with _icon_cache_lock:
+        cache = _icon_disk_cache()
+        if wm_class in cache:
+            return cache[wm_class]
+
+    icon_name = desktop_file_from_wm_class(wm_class)
+    icon_path = None
+    if icon_name is not None:
+        theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
+        # IconTheme already picks the best size internally, no need to probe resolutions
+        icon = theme.lookup_icon(icon_name, [], 64, 1, 0, 0)
         if icon:
-            return icon
-    return None
+            file = icon.get_file()
+            if file:
+                icon_path = file.get_path()
+    with _icon_cache_lock:
+        cache[wm_class] = icon_path
+    return icon_path
 
 def run_in_executor(f):
     @functools.wraps(f)
@@ -136,26 +194,55 @@ def to_pil(surface: cairo.ImageSurface) -> Image.Image:
     stride = surface.get_stride()
 
     with surface.get_data() as memory:
+        # frombuffer accepts any buffer-protocol object, so only pay for a
+        # tobytes() copy when the rows aren't tightly packed
+        pixels = memory if stride == size[0] * 4 else memory.tobytes()
         if format == cairo.Format.RGB24:
             return Image.frombuffer(
-                "RGB", size, memory.tobytes(),
+                "RGB", size, pixels,
                 'raw', "BGRX", stride)
         elif format == cairo.Format.ARGB32:
             return Image.frombuffer(
-                "RGBA", size, memory.tobytes(),
+                "RGBA", size, pixels,
                 'raw', "BGRa", stride)
         else:
             raise NotImplementedError(repr(format))
 
+def to_pil_opaque(surface: cairo.ImageSurface) -> Image.Image:
+    # ARGB32 is premultiplied, so over a black background the color
+    # channels are already the composited result: decode them as opaque
+    # BGRX and skip the per-pixel unpremultiply the BGRa decoder does
+    size = (surface.get_width(), surface.get_height())
+    stride = surface.get_stride()
+
+    with surface.get_data() as memory:
+        pixels = memory if stride == size[0] * 4 else memory.tobytes()
+        return Image.frombuffer(
+            "RGB", size, pixels,
+            'raw', "BGRX", stride)
+
+def render_svg(path: str, width: int, height: int) -> cairo.ImageSurface:
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    viewport = Rsvg.Rectangle()
+    viewport.x = 0
+    viewport.y = 0
+    viewport.width = width
+    viewport.height = height
+    Rsvg.Handle.new_from_file(path).render_document(cairo.Context(surface), viewport)
+    surface.flush()
+    return surface
+
 
 class LoadedKWinScript:
     _script_id: int
     _filename: str
+    _fd: int
     _proxy_obj: Any
     _interface: Any
-    def __init__(self, id: int, filename: str, introsepct, bus) -> None:
+    def __init__(self, id: int, filename: str, fd: int, introsepct, bus) -> None:
         self._script_id = id
         self._filename = filename
+        self._fd = fd
         self._proxy_obj = bus.get_proxy_object("org.kde.KWin", "/Scripting/Script" + str(id), introsepct)
         self._interface = self._proxy_obj.get_interface('org.kde.kwin.Script')
     
@@ -171,28 +258,41 @@ class KWinScriptRunner:
         self.bus = bus
         self.kwin_proxy = self.bus.get_proxy_object("org.kde.KWin", "/Scripting", introspect)
         self.scripting = self.kwin_proxy.get_interface('org.kde.kwin.Scripting')
+        # every /Scripting/Script{id} object exposes the same interface, so
+        # one introspection round trip covers all of them
+        self._script_introspection = None
     
     @classmethod
-    async def create(cls, bus = None):
-        bus = (await MessageBus().connect()) if bus is None else bus
+    async def create(cls, bus):
+        # the caller owns the one shared bus connection; implicitly opening
+        # another socket + auth handshake here would hide a real cost
         introspection = await bus.introspect("org.kde.KWin", "/Scripting")
         return KWinScriptRunner(bus, introspection)
     
     async def load(self, script: str) -> LoadedKWinScript:
-        (fd, filename) = tempfile.mkstemp(text=True)
+        if hasattr(os, "memfd_create"):
+            # back the script with anonymous memory; KWin reads it through
+            # our /proc fd entry, so nothing ever touches disk. The fd must
+            # stay open until unload or the /proc path disappears.
+            fd = os.memfd_create("plasmadeck-kwin-script")
+            filename = f"/proc/{os.getpid()}/fd/{fd}"
+        else:
+            (fd, filename) = tempfile.mkstemp(text=True)
         script_bytes = script.encode("utf-8")
         written_len = os.write(fd, script_bytes)
         assert len(script_bytes) == written_len
 
         script_id = await self.scripting.call_load_script(filename)
-        os.close(fd)
         print(f"Created Script #{script_id}: '{filename}'")
-        introspection = await self.bus.introspect("org.kde.KWin", "/Scripting/Script" + str(script_id))
-        return LoadedKWinScript(script_id, filename, introspection, self.bus)
-    
+        if self._script_introspection is None:
+            self._script_introspection = await self.bus.introspect("org.kde.KWin", "/Scripting/Script" + str(script_id))
+        return LoadedKWinScript(script_id, filename, fd, self._script_introspection, self.bus)
+
     async def unload(self, script: LoadedKWinScript) -> None:
         await self.scripting.call_unload_script(script._filename)
-        os.remove(script._filename)
+        os.close(script._fd)
+        if not script._filename.startswith("/proc/"):
+            os.remove(script._filename)
 
 DBUS_ADDR="net.shehadeh.PlasmaDeckWindowListener"
 DBUS_OBJ="/net/shehadeh/PlasmaDeckWindowListener"
@@ -201,12 +301,28 @@ DBUS_IFACE="net.shehadeh.PlasmaDeckWindowListener"
 def js_call_dbus(*args):
     return f"callDBus(\"{DBUS_ADDR}\", \"{DBUS_OBJ}\", \"{DBUS_IFACE}\", {",".join(args)})"
 
-log = """
+log = "".join([
+    """
 function log(msg) {
     console.log('PlasmaDeckWindowListener', msg);
-    """ + js_call_dbus("'Log'", "msg.toString()") + """
+    """,
+    js_call_dbus("'Log'", "msg.toString()"),
+    """
 }
-"""
+""",
+])
+
+FOCUS_WINDOW_TEMPLATE = string.Template(log + """
+    for(const win of workspace.windowList()) {
+        if (win.internalId.toString() == $uuid)
+            workspace.activeWindow = win
+    }
+""")
+
+def focus_window_script(uuid):
+    # json.dumps quotes and escapes the uuid so it lands in the JS
+    # source as a proper string literal
+    return FOCUS_WINDOW_TEMPLATE.substitute(uuid=json.dumps(uuid))
 class PlasmaDeckWindowListener(ServiceInterface):
     windows: dict[str, WindowData]
     slots: list[None | str]
@@ -218,64 +334,143 @@ class PlasmaDeckWindowListener(ServiceInterface):
         self.deck = deck
         self.deck.set_key_callback_async(self.handle_press())
         self.runner = runner
-        self.slots = [None, None, None, None, None, None, None, None]
+        key_count = self.deck.key_count()
+        self.slots = [None] * key_count
+        self._free_slots: deque[int] = deque(range(key_count))
+        self._uuid_to_slot: dict[str, int] = {}
+        self._key_size = self.deck.key_image_format()["size"]
+        self._blank_native = PILHelper.to_native_key_format(self.deck, PILHelper.create_key_image(self.deck))
+        self._native_img_cache: dict[str, bytes] = {}
+        self._pending: list[tuple[str, str, str | None]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
 
     def handle_press(self):
         async def _cb(deck, key, state):
-            script = log + """
-                for(const win of workspace.windowList()) {
-                    log(win.internalId.toString() + " == " + '""" + self.slots[key] + """');
-                    if (win.internalId.toString() == '""" + self.slots[key] + """')
-                        workspace.activeWindow = win
-                }
-            """
-            if state:
-                script_obj = await self.runner.load(script)
-                await script_obj.run()
+            if not state:
+                return
+            uuid = self.slots[key]
+            if uuid is None:
+                return
+            # KWin scripts are one-shot: run() does nothing once the script
+            # has executed, so load a fresh one per press. With the memfd
+            # backing and cached introspection this is a few D-Bus calls
+            # and no disk IO.
+            script = await self.runner.load(focus_window_script(uuid))
+            try:
+                await script.run()
+            finally:
+                await self.runner.unload(script)
         return _cb
 
     @method()
     def Log(self, msg: 's'):
         print("SCRIPT: ", msg)
 
+    @run_in_executor
+    def _build_native_image(self, icon_path):
+        if icon_path.endswith(".svg"):
+            # rasterize at exactly key resolution: vector-exact quality and
+            # no downscaling pass afterwards; the deck's native encode is
+            # opaque RGB, so decode the surface straight to that
+            img = to_pil_opaque(render_svg(icon_path, *self._key_size))
+        else:
+            # BILINEAR is visually indistinguishable from the LANCZOS kernel
+            # create_scaled_key_image would use at key resolution, and much
+            # cheaper per pixel
+            img = Image.open(icon_path).convert("RGBA")
+            img.thumbnail(self._key_size, Image.Resampling.BILINEAR)
+            canvas = PILHelper.create_key_image(self.deck)
+            canvas.paste(img, ((canvas.width - img.width) // 2,
+                               (canvas.height - img.height) // 2), img)
+            img = canvas
+        return PILHelper.to_native_key_format(self.deck, img)
+
+    async def _native_image_for(self, wm_class):
+        native_img = self._native_img_cache.get(wm_class)
+        if native_img is None:
+            # resolve the icon path here on the loop thread: GTK is not
+            # thread-safe off the main thread, and after the table build
+            # the lookup is a dict hit anyway. Only the CPU-heavy
+            # decode/scale/encode goes to the pool; set_key_image stays on
+            # the loop thread to avoid racing other USB-HID writes.
+            icon_path = get_icon_path_by_wm_class(wm_class)
+            if icon_path is None:
+                return None
+            native_img = await self._build_native_image(icon_path)
+            if native_img is not None:
+                self._native_img_cache[wm_class] = native_img
+        return native_img
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(0.05, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        # hold a strong reference so the task can't be collected mid-flight
+        # and its exceptions don't surface as "never retrieved" at GC
+        self._flush_task = asyncio.ensure_future(self._flush())
+
+    async def _flush(self):
+        pending, self._pending = self._pending, []
+        # net out the batch: a remove cancels a still-pending add
+        adds: dict[str, str] = {}
+        removes: list[str] = []
+        for event, uuid, wm_class in pending:
+            if event == "add":
+                adds[uuid] = wm_class
+            elif uuid in adds:
+                del adds[uuid]
+            else:
+                removes.append(uuid)
+
+        for uuid in removes:
+            slot = self._uuid_to_slot.pop(uuid, None)
+            if slot is not None:
+                self.slots[slot] = None
+                self._free_slots.append(slot)
+                self.deck.set_key_image(slot, self._blank_native)
+
+        # one corrupt icon or failed D-Bus call must not abandon the rest
+        # of the batch
+        images = await asyncio.gather(
+            *(self._native_image_for(wm_class) for wm_class in adds.values()),
+            return_exceptions=True)
+        for (uuid, wm_class), native_img in zip(adds.items(), images):
+            if isinstance(native_img, BaseException):
+                print(f"failed to render icon for {wm_class}: {native_img}")
+                continue
+            if native_img is None or not self._free_slots:
+                continue
+            slot = self._free_slots.popleft()
+            self.slots[slot] = uuid
+            self._uuid_to_slot[uuid] = slot
+            self.deck.set_key_image(slot, native_img)
+
     @method()
     def WindowAdded(self, uuid: 's', caption: 's', resourceClass: 's'):
         print("Add", uuid)
-        icon = get_icon_path_by_wm_class(resourceClass)
-        if icon is not None:
-            icon_path = icon.get_file().get_path()
-            img = None
-            if icon_path.endswith(".svg"):
-                png = cairosvg.svg2png(url=icon_path)
-                img = Image.open(BytesIO(png))
-            else:
-                img = Image.open(icon_path)
-            scale_img = PILHelper.create_scaled_key_image(self.deck, img, margins=[0, 0, 0, 0])
-            native_img = PILHelper.to_native_key_format(self.deck, scale_img)
-            my_key = None
-            for key, win in enumerate(self.slots):
-                if win is None:
-                    my_key = key
-                    self.slots[my_key] = uuid
-                    break
-            if my_key is not None:
-                self.deck.set_key_image(my_key, native_img)
         self.windows[uuid] = WindowData(uuid, caption, resourceClass)
+        self._pending.append(("add", uuid, resourceClass))
+        self._schedule_flush()
 
     @method()
     def WindowRemoved(self, uuid: 's'):
         del self.windows[uuid]
-        for key, win in enumerate(self.slots):
-            if win == uuid:
-                self.slots[key] = None
-                self.deck.set_key_image(key, None)
+        self._pending.append(("remove", uuid, None))
+        self._schedule_flush()
 
 
-SCRIPT = log +"""
+SCRIPT = "".join([
+    log,
+    """
 function add(window) {
   try {
     log("ADD [enter] caption='" + window.caption + "', resourceClass=" + window.resourceClass);
-    """ + js_call_dbus("'WindowAdded'", "window.internalId.toString()", "window.caption", "window.resourceClass") +"""
+    """,
+    js_call_dbus("'WindowAdded'", "window.internalId.toString()", "window.caption", "window.resourceClass"),
+    """
     log("ADD [exit] caption='" + window.caption + "', resourceClass=" + window.resourceClass);
   } catch(e) {
     log("ADD [error] caption='" + window.caption + "', resourceClass=" + window.resourceClass + ", error=" + e.toString());
@@ -285,7 +480,9 @@ function add(window) {
 function remove(window) {
   try {
     log("REMOVE [enter] caption='" + window.caption + "', resourceClass=" + window.resourceClass);
-    """ + js_call_dbus("'WindowRemoved'", "window.internalId.toString()", "window.caption", "window.resourceClass") +"""
+    """,
+    js_call_dbus("'WindowRemoved'", "window.internalId.toString()", "window.caption", "window.resourceClass"),
+    """
     log("REMOVE [exit] caption='" + window.caption + "', resourceClass=" + window.resourceClass);
   } catch(e) {
     log("REMOVE [error] caption='" + window.caption + "', resourceClass=" + window.resourceClass + ", error=" + e.toString());
@@ -300,34 +497,43 @@ for (const window of workspace.windowList()) {
 
 workspace.windowAdded.connect(add)
 workspace.windowRemoved.connect(remove)
-"""
+""",
+])
     
 async def main():
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max(8, (os.cpu_count() or 1) + 4)))
+    main_task = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, main_task.cancel)
     bus = await MessageBus().connect()
     script_runner = await KWinScriptRunner.create(bus)
     streamdecks = DeviceManager().enumerate()
     print(f"Found {len(streamdecks)} Stream Deck devices")
 
-    for index, deck in enumerate(streamdecks):
-        # This example only works with devices that have screens.
-        if not deck.is_visual():
-            continue
-
-        deck.open()
-        deck.reset()
+    async def init_deck(deck):
+        # open/reset/brightness all block on USB, so run them on the
+        # executor and let every deck initialize concurrently
+        await asyncio.to_thread(deck.open)
+        await asyncio.to_thread(deck.reset)
 
         print("Opened '{}' device (serial number: '{}', fw: '{}')".format(
-            deck.deck_type(), deck.get_serial_number(), deck.get_firmware_version()
+            deck.deck_type(),
+            await asyncio.to_thread(deck.get_serial_number),
+            await asyncio.to_thread(deck.get_firmware_version),
         ))
 
         # Set initial screen brightness to 30%.
-        deck.set_brightness(30)
-        
+        await asyncio.to_thread(deck.set_brightness, 30)
+
         # deck_interface_name = deck.deck_type().replace(" ", "")
 
         # interface = StreamDeckInterface(deck)
-    
+
         bus.export(f'/net/shehadeh/PlasmaDeckWindowListener', PlasmaDeckWindowListener(deck, script_runner))
+
+    # This example only works with devices that have screens.
+    await asyncio.gather(*(init_deck(deck) for deck in streamdecks if deck.is_visual()))
     await bus.request_name('net.shehadeh.PlasmaDeckWindowListener')
 
     listener_script = await script_runner.load(SCRIPT)
@@ -339,13 +545,13 @@ async def main():
         print("cleaning up")
         await listener_script.stop()
 
-loop = asyncio.get_event_loop()
-
-main_task = asyncio.ensure_future(main())
-for signal in [signal.SIGINT, signal.SIGTERM]:
-    loop.add_signal_handler(signal, main_task.cancel)
-try:
-    loop.run_until_complete(main_task)
-finally:
-    loop.close()
+if __name__ == "__main__":
+    try:
+        # libuv-backed event loop: noticeably faster socket dispatch for
+        # the D-Bus traffic this daemon lives on, when available
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(main())
 